@@ -35,14 +35,16 @@ RUN LOCALLY:
   dagster dev -f movies_pipeline.py
   # Open http://localhost:3000 in your browser
 
-  # Or materialize everything from CLI:
-  dagster asset materialize --select "*" -f movies_pipeline.py
+  # Or materialize everything from CLI (the ingest asset is partitioned by
+  # release date, so name the day to ingest):
+  dagster asset materialize --select "*" --partition 2024-03-01 -f movies_pipeline.py
 =============================================================================
 """
 
+import json
 import os
-import subprocess
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Load .env file so that dbt parse (called by prepare_if_dev) can read
@@ -57,25 +59,35 @@ from pathlib import Path
 #   load_dotenv() is a no-op if the file does not exist -- safe for prod.
 #   override=False means real env vars (already set in the shell) take
 #   precedence over anything in .env, which is the correct precedence.
-try:
-    from dotenv import load_dotenv
-    _ENV_FILE = Path(__file__).parent.parent / ".env"
-    load_dotenv(dotenv_path=_ENV_FILE, override=False)
-except ImportError:
-    pass   # python-dotenv not installed; rely on shell env vars being set
+#
+#   With DAGSTER_ENV=prod the platform injects every variable, so we skip
+#   importing python-dotenv and looking for a .env file altogether.
+if os.environ.get("DAGSTER_ENV") != "prod":
+    try:
+        from dotenv import load_dotenv
+        _ENV_FILE = Path(__file__).parent.parent / ".env"
+        load_dotenv(dotenv_path=_ENV_FILE, override=False)
+    except ImportError:
+        pass   # python-dotenv not installed; rely on shell env vars being set
 
 from dagster import (
     AssetExecutionContext,
-    AssetKey,
     AssetSelection,
+    BackfillPolicy,
+    DailyPartitionsDefinition,
     Definitions,
     MaterializeResult,
-    ScheduleDefinition,
+    RunRequest,
+    ScheduleEvaluationContext,
     asset,
+    build_schedule_from_partitioned_job,
     define_asset_job,
+    multiprocess_executor,
+    schedule,
 )
 from dagster_dbt import (
     DagsterDbtTranslator,
+    DagsterDbtTranslatorSettings,
     DbtCliResource,
     DbtProject,
     dbt_assets,
@@ -88,6 +100,15 @@ PROJECT_ROOT    = Path(__file__).parent.parent          # Snowflake_DBT/
 DBT_PROJECT_DIR = PROJECT_ROOT / "dbt_project"          # Snowflake_DBT/dbt_project/
 SRC_DIR         = PROJECT_ROOT / "src"                  # Snowflake_DBT/src/
 
+# str() once; APIs below (sys.path, os.scandir, DbtProject) take plain strings
+_PROJECT_ROOT_STR    = str(PROJECT_ROOT)
+_DBT_PROJECT_DIR_STR = str(DBT_PROJECT_DIR)
+
+# Make "import src.*" resolve from the project root, exactly as it does when
+# the ingestion pipeline is started with "python -m src.main".
+if _PROJECT_ROOT_STR not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT_STR)
+
 # =============================================================================
 # DbtProject -- tells Dagster where the dbt project lives
 # =============================================================================
@@ -108,48 +129,90 @@ SRC_DIR         = PROJECT_ROOT / "src"                  # Snowflake_DBT/src/
 #
 #   In production (CI/CD or Dagster Cloud) you pre-compile the manifest and
 #   skip prepare_if_dev() entirely -- env vars are injected by the platform.
-dbt_project = DbtProject(project_dir=str(DBT_PROJECT_DIR))
-dbt_project.prepare_if_dev()
-
-dbt_resource = DbtCliResource(project_dir=dbt_project)
-
-
-# =============================================================================
-# DagsterDbtTranslator -- customize how dbt models appear in Dagster UI
-# =============================================================================
-# TEACHING NOTE:
-#   @dbt_assets auto-creates one Dagster asset per dbt model.
-#   DagsterDbtTranslator lets you control how those assets are labeled
-#   in the Dagster UI -- group names, descriptions, tags, etc.
 #
-#   dbt_resource_props is the raw dict from the dbt manifest for each node.
-#   It contains: name, tags, config, description, schema, database, etc.
+#   Re-parsing on every reload is wasteful: "dagster dev" re-imports this file
+#   on each save, and "dbt parse" costs seconds of dbt start-up even when
+#   nothing changed.  _prepare_manifest_if_stale() compares manifest.json's
+#   mtime with the newest .sql/.yml/.csv file in the project (seed CSVs are
+#   parse inputs too: each one becomes a manifest node) and only calls
+#   prepare_if_dev() when a source file is newer.  Set
+#   DAGSTER_DBT_PARSE_PROJECT_ON_LOAD=0 to skip the check entirely (CI images
+#   that ship a pre-built manifest).
+_DBT_SOURCE_SUFFIXES = (".sql", ".yml", ".yaml", ".csv")
+_DBT_SKIP_DIRS = {"target", "logs"}    # dbt outputs, not parse inputs
+
+# project dir -> newest source mtime; one tree walk per process
+_source_mtime_cache: dict[str, float] = {}
+
+
+def _newest_source_mtime(project_dir: str) -> float:
+    """Return the newest mtime of any dbt source file under project_dir."""
+    if project_dir in _source_mtime_cache:
+        return _source_mtime_cache[project_dir]
+
+    newest = 0.0
+    pending = [project_dir]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _DBT_SKIP_DIRS:
+                        pending.append(entry.path)
+                elif entry.name.endswith(_DBT_SOURCE_SUFFIXES):
+                    newest = max(newest, entry.stat().st_mtime)
+
+    _source_mtime_cache[project_dir] = newest
+    return newest
+
+
+def _prepare_manifest_if_stale(project: DbtProject) -> None:
+    """Run prepare_if_dev() only when manifest.json is missing or out of date."""
+    if os.environ.get("DAGSTER_DBT_PARSE_PROJECT_ON_LOAD") == "0":
+        return
+
+    try:
+        manifest_mtime = project.manifest_path.stat().st_mtime
+    except FileNotFoundError:
+        project.prepare_if_dev()   # first run: nothing to compare against
+        return
+
+    if manifest_mtime >= _newest_source_mtime(_DBT_PROJECT_DIR_STR):
+        return
+
+    project.prepare_if_dev()
+
+
+# TEACHING NOTE -- partial parsing:
+#   dbt caches its parsed project in target/partial_parse.msgpack and, on the
+#   next invocation, re-parses only the files that changed.  We pass
+#   --partial-parse explicitly on every call.
+#   Each invocation still gets its OWN target directory (dagster-dbt's
+#   default): dagster-dbt copies the project's partial_parse.msgpack into it
+#   before dbt starts, so partial parsing keeps working, and two runs that
+#   overlap (daily run, weekly run, data_quality_checks) never overwrite
+#   each other's manifest.json or run_results.json.
+#   DBT_SEND_ANONYMOUS_USAGE_STATS=false skips dbt's usage-stats HTTP call,
+#   which otherwise sits on the start-up path of every invocation.  Both
+#   defaults are set BEFORE the import-time "dbt parse" below, so that
+#   invocation skips the call too.
 #
-#   We use the dbt tags we already set in dbt_project.yml ("bronze", "silver",
-#   "gold", "marts") to put each model into the matching Dagster group.
-#   This makes the asset graph in the UI mirror the medallion architecture.
-class MoviesDbtTranslator(DagsterDbtTranslator):
-    """
-    Maps dbt model tags -> Dagster asset group names.
-
-    Result in Dagster UI:
-      Group "bronze"  -> bronze_movies_raw
-      Group "silver"  -> silver_movies, silver_genres, silver_movie_genres, ...
-      Group "gold"    -> dim_dates, dim_genres, dim_production_companies, fact_movies
-      Group "marts"   -> kpi_genre_performance, kpi_yearly_trends, kpi_top_movies
-    """
-
-    def get_group_name(self, dbt_resource_props):
-        tags = dbt_resource_props.get("tags", [])
-        if "marts" in tags:
-            return "marts"
-        if "gold" in tags:
-            return "gold"
-        if "silver" in tags:
-            return "silver"
-        if "bronze" in tags:
-            return "bronze"
-        return "transformation"
+#   Orchestration settings (DBT_THREADS, DAGSTER_MAX_CONCURRENT) are read
+#   from the environment right here, not via src/config.load_config():
+#   load_config() requires the TMDb and Snowflake credentials, and loading
+#   this code location (or running dbt_refresh_only) must not depend on them.
+os.environ.setdefault("DBT_PARTIAL_PARSE", "true")
+os.environ.setdefault("DBT_SEND_ANONYMOUS_USAGE_STATS", "false")
+
+dbt_project = DbtProject(project_dir=_DBT_PROJECT_DIR_STR)
+_prepare_manifest_if_stale(dbt_project)
+
+_DBT_GLOBAL_FLAGS = ["--partial-parse", "--no-use-colors"]
+_DBT_THREADS      = os.environ.get("DBT_THREADS", "8")
+
+dbt_resource = DbtCliResource(
+    project_dir=dbt_project,
+    global_config_flags=_DBT_GLOBAL_FLAGS,
+)
 
 
 # =============================================================================
@@ -159,84 +222,82 @@ class MoviesDbtTranslator(DagsterDbtTranslator):
 #   @asset creates a single Software-Defined Asset.
 #   group_name groups this asset visually in the Dagster UI.
 #   compute_kind shows as a badge (python, dbt, sql, etc.) on the asset node.
+#
+#   PARTITIONS:
+#   The asset is partitioned by release date -- one partition per day.  The
+#   partition for 2024-03-01 ingests the movies released on 2024-03-01, so a
+#   daily run only asks TMDb for the new day instead of re-reading the same
+#   "popular" list every morning.
+#
+#   BACKFILL POLICY:
+#   Backfilling a year means 365 partitions.  With the default policy Dagster
+#   launches 365 separate runs (365 x run start-up, 365 x Snowflake login).
+#   BackfillPolicy.single_run() launches ONE run for the whole range instead:
+#   one run start-up and one Snowflake login.  Inside that run the extractor
+#   still queries /discover/movie once PER DAY in context.partition_keys, with
+#   the page cap applied per day -- one query for the whole range would stop
+#   at TMDB_PAGES_TO_FETCH pages and silently drop most of the movies while
+#   Dagster marked every day as materialized.
+daily_partitions = DailyPartitionsDefinition(start_date="2023-01-01")
+
+
 @asset(
     name="raw_movies_bronze",
     group_name="ingestion",
     compute_kind="python",
-    description="Ingest latest movies from TMDb API into Snowflake BRONZE.RAW_MOVIES",
+    partitions_def=daily_partitions,
+    backfill_policy=BackfillPolicy.single_run(),
+    description="Ingest movies released in the partition window from TMDb into Snowflake BRONZE.RAW_MOVIES",
 )
 def ingest_tmdb_to_bronze(context: AssetExecutionContext) -> MaterializeResult:
     """
-    Run the Python TMDb ingestion script (src/main.py).
+    Run the Python TMDb ingestion pipeline (src/main.py) in this process.
 
     This is the Extract + Load step:
-      1. Calls TMDb API (/movie/popular, /genre/movie/list, etc.)
+      1. Calls TMDb API (/discover/movie for the partition window, /genre/movie/list, etc.)
       2. Writes raw JSON to Snowflake BRONZE.RAW_MOVIES via snowflake-connector-python
     """
-    # TEACHING NOTE -- why "-m src.main" instead of "python src/main.py":
+    # TEACHING NOTE -- why call run_pipeline() directly?
     #
-    #   src/main.py uses package-relative imports:
-    #     from src.config import load_config
-    #     from src.extract import TMDbExtractor
+    #   Dagster is already a Python process, so there is no need to start a
+    #   second interpreter with "python -m src.main".  Importing the module and
+    #   calling run_pipeline() skips the interpreter start-up and the second
+    #   .env/config parse, and a failure surfaces here as a real Python
+    #   exception with a full traceback instead of a blob of captured stderr.
     #
-    #   When Python runs a file as a plain script (python path/to/main.py) it
-    #   adds the *script's directory* (src/) to sys.path.  From inside src/,
-    #   "from src.config import ..." looks for src/src/config.py -- which does
-    #   not exist.  The script exits with ImportError (exit code 1).
+    #   Passing context.log as the logger routes the pipeline's step-by-step
+    #   log lines into the Dagster run log.
     #
-    #   Running as a module (python -m src.main) adds the *project root* to
-    #   sys.path, so "from src.config import ..." correctly resolves to
-    #   src/config.py.  Always use -m for packages with relative imports.
-    #
-    #   sys.executable: guarantees we use the same Python interpreter (and
-    #   therefore the same venv) as the Dagster process itself, rather than
-    #   whatever "python" resolves to on the system PATH.
-    context.log.info(f"Running ingestion module: src.main (cwd={PROJECT_ROOT})")
-
-    result = subprocess.run(
-        [sys.executable, "-m", "src.main"],
-        capture_output=True,
-        text=True,
-        encoding="utf-8",   # decode captured stdout/stderr as UTF-8, not cp1252
-        cwd=str(PROJECT_ROOT),
-        env={
-            **os.environ,
-            # TEACHING NOTE -- subprocess encoding on Windows:
-            #
-            #   capture_output=True redirects stdout/stderr to pipes.
-            #   On Windows, pipes default to the system code page (cp1252).
-            #   The 'rich' library uses Unicode braille characters for its
-            #   progress spinner (e.g. U+2819 = braille dot 3).  cp1252
-            #   cannot encode those, causing UnicodeEncodeError on teardown.
-            #
-            #   PYTHONUTF8=1  -- Python UTF-8 Mode: forces all text I/O in
-            #     the subprocess (including rich's internal writes) to use
-            #     UTF-8 instead of the system code page.
-            #
-            #   NO_COLOR=1    -- Standard env var (no-color.org) respected by
-            #     rich, click, and most modern CLI tools.  Disables all ANSI
-            #     colour codes and switches rich to plain-text output -- no
-            #     spinner characters, no colour markup.  Safe for non-TTY
-            #     capture (like Dagster's capture_output=True).
-            "PYTHONUTF8":     "1",
-            "NO_COLOR":       "1",
-            # Snowflake / TMDb credentials forwarded from parent environment
-            "SNOWFLAKE_ACCOUNT":  os.environ.get("SNOWFLAKE_ACCOUNT", ""),
-            "SNOWFLAKE_USER":     os.environ.get("SNOWFLAKE_USER", ""),
-            "SNOWFLAKE_PASSWORD": os.environ.get("SNOWFLAKE_PASSWORD", ""),
-            "TMDB_API_KEY":       os.environ.get("TMDB_API_KEY", ""),
-        },
+    #   The import lives inside the function so that loading this file (which
+    #   "dagster dev" does on every reload) does not import the Snowflake
+    #   connector.
+    from src.config import load_config
+    from src.main import run_pipeline
+
+    # A single-run backfill covers many partitions: start/end span all of them.
+    # Daily partitions are contiguous, so the window holds exactly
+    # context.partition_keys, and run_pipeline queries TMDb one day at a time.
+    window = context.partition_key_range
+    context.log.info(
+        f"Running ingestion in-process: src.main.run_pipeline() "
+        f"for releases {window.start} -> {window.end} "
+        f"({len(context.partition_keys)} daily partition(s))"
+    )
+    stats = run_pipeline(
+        config=load_config(),
+        log=context.log,
+        release_dates=(window.start, window.end),
     )
 
-    if result.returncode != 0:
-        context.log.error(result.stderr)
-        raise RuntimeError(f"Ingestion script failed (exit {result.returncode})")
-
-    context.log.info(result.stdout)
     return MaterializeResult(
         metadata={
-            "module":       "src.main",
-            "target_table": "LECTURE_DE.BRONZE.RAW_MOVIES",
+            "module":           "src.main",
+            "target_table":     "LECTURE_DE.BRONZE.RAW_MOVIES",
+            "release_date_from": window.start,
+            "release_date_to":   window.end,
+            "rows_ingested":    stats["movies_loaded"],
+            "genres_loaded":    stats["genres_loaded"],
+            "duration_seconds": stats["duration_seconds"],
         }
     )
 
@@ -254,137 +315,117 @@ def ingest_tmdb_to_bronze(context: AssetExecutionContext) -> MaterializeResult:
 #     name                 -- name for the op/function, not individual asset names
 #     dagster_dbt_translator -- our custom class to control UI labels/groups
 #
-#   The function body is simple: just yield from dbt.cli(["run"], ...).stream()
+#   The function body is simple: just yield from dbt.cli(["build"], ...).stream()
 #   Dagster handles logging, progress tracking, and asset materialization events.
 #
+#   WHY "dbt build" INSTEAD OF run + snapshot + test?
+#   "dbt build" runs models, snapshots, seeds AND tests in ONE invocation,
+#   walking the DAG in topological order: each model's tests run right after
+#   the model builds, and snap_silver_movies runs as soon as silver_movies is
+#   done.  One invocation means dbt starts, loads the manifest and
+#   authenticates to Snowflake ONCE instead of three times.
+#   Snapshots show up as assets (in the silver/gold groups via their tags) and
+#   tests show up as asset checks attached to the model they test.
+#
+#   --store-failures writes failing test rows to Snowflake for inspection:
+#     SELECT * FROM DBT_DEV.dbt_test__audit.<test_name>_failures
+#
+#   --threads controls how many independent models dbt builds at once.
+#   The silver models, the dims and the three kpi_* marts do not depend on
+#   each other, so with 8 threads they run side by side instead of queueing.
+#   TRADE-OFF: each thread is a concurrent query on the warehouse.  More
+#   threads cut wall-clock time, but keep the warehouse busier (and, if the
+#   queries queue, may need a larger warehouse = more credits).  Tune it with
+#   the DBT_THREADS env var (default 8; overrides threads: in profiles.yml).
+#
 #   Layer execution order is auto-determined by dbt's ref() graph:
-#     bronze_movies_raw -> silver_* -> dim_* -> fact_movies -> kpi_*
-@dbt_assets(
-    manifest=dbt_project.manifest_path,
-    project=dbt_project,
-    name="dbt_movie_models",
-    dagster_dbt_translator=MoviesDbtTranslator(),
-)
-def dbt_movie_models(context: AssetExecutionContext, dbt: DbtCliResource):
-    """Run all dbt models in dependency order (bronze -> silver -> gold -> marts)."""
-    yield from dbt.cli(["run"], context=context).stream()
-
-
+#     bronze_movies_raw -> silver_* -> snapshots -> dim_* -> fact_movies -> kpi_*
 # =============================================================================
-# ASSET 3: dbt Snapshots (SCD2)
+# DagsterDbtTranslator -- customize how dbt models appear in Dagster UI
 # =============================================================================
 # TEACHING NOTE:
-#   This asset runs "dbt snapshot" AFTER silver + gold models are built.
-#   We declare deps on specific dbt asset keys so Dagster knows the order:
-#     silver_movies must finish before snap_silver_movies runs.
-#     dim_genres must finish before snap_dim_genres runs.
+#   @dbt_assets auto-creates one Dagster asset per dbt model.
+#   DagsterDbtTranslator lets you control how those assets are labeled
+#   in the Dagster UI -- group names, descriptions, tags, etc.
 #
-#   AssetKey("silver_movies") matches the dbt model named "silver_movies".
-#   @dbt_assets creates assets with keys matching the dbt model names exactly.
-@asset(
-    name="snapshot_scd2",
-    group_name="transformation",
-    compute_kind="dbt",
-    deps=[
-        AssetKey("silver_movies"),   # snap_silver_movies tracks this
-        AssetKey("dim_genres"),      # snap_dim_genres tracks this
-    ],
-    description=(
-        "SCD Type 2 snapshots: snap_silver_movies (revenue/rating history) "
-        "and snap_dim_genres (genre reclassification history)."
-    ),
-)
-def run_dbt_snapshots(context: AssetExecutionContext) -> MaterializeResult:
+#   dbt_resource_props is the raw dict from the dbt manifest for each node.
+#   It contains: name, tags, config, description, schema, database, etc.
+#
+#   We use the dbt tags we already set in dbt_project.yml ("bronze", "silver",
+#   "gold", "marts") to put each model into the matching Dagster group.
+#   This makes the asset graph in the UI mirror the medallion architecture.
+class MoviesDbtTranslator(DagsterDbtTranslator):
     """
-    Run dbt snapshot command.
-
-    TEACHING: dbt snapshot compares current data against the last snapshot.
-    If any check_cols changed, it:
-      1. Marks the old row as expired (sets dbt_valid_to = now)
-      2. Inserts a new row with the updated values (dbt_valid_to = NULL)
-    This creates a full audit trail of every attribute change over time.
-    See scripts/incremental_demo.sql for a step-by-step walkthrough.
+    Maps dbt model tags -> Dagster asset group names.
+
+    Result in Dagster UI:
+      Group "bronze"  -> bronze_movies_raw
+      Group "silver"  -> silver_movies, silver_genres, silver_movie_genres, ...
+      Group "gold"    -> dim_dates, dim_genres, dim_production_companies, fact_movies
+      Group "marts"   -> kpi_genre_performance, kpi_yearly_trends, kpi_top_movies
     """
-    context.log.info("Running dbt snapshots (SCD2)...")
-
-    result = subprocess.run(
-        ["dbt", "snapshot", "--profiles-dir", str(DBT_PROJECT_DIR)],
-        capture_output=True,
-        text=True,
-        cwd=str(DBT_PROJECT_DIR),
-        env=os.environ,
-    )
 
-    if result.returncode != 0:
-        context.log.error(result.stderr)
-        raise RuntimeError("dbt snapshot failed")
+    # First match wins: marts models are also tagged "gold"
+    _GROUP_PRIORITY = ("marts", "gold", "silver", "bronze")
 
-    context.log.info(result.stdout)
-    return MaterializeResult(
-        metadata={"snapshots": ["snap_silver_movies", "snap_dim_genres"]}
-    )
+    def get_group_name(self, dbt_resource_props):
+        tags = set(dbt_resource_props.get("tags", ()))
+        for group in self._GROUP_PRIORITY:
+            if group in tags:
+                return group
+        return "transformation"
 
 
-# =============================================================================
-# ASSET 4: dbt Tests (Data Quality Validation)
-# =============================================================================
-# TEACHING NOTE:
-#   dbt test runs three test categories:
-#     1. Schema tests    -- not_null, unique, accepted_values, relationships
-#     2. dbt_expectations -- statistical range + count checks
-#     3. Custom SQL tests -- business rule assertions (tests/ directory)
-#
-#   --store-failures writes failing rows to Snowflake so you can inspect them:
-#     SELECT * FROM DBT_DEV.dbt_test__audit.<test_name>_failures
-#
-#   deps=[AssetKey("snapshot_scd2")] ensures tests run after snapshots.
-@asset(
-    name="data_quality_tests",
-    group_name="validation",
-    compute_kind="dbt",
-    deps=[AssetKey("snapshot_scd2")],
-    description="Run all dbt tests across bronze/silver/gold/marts layers",
+@dbt_assets(
+    manifest=dbt_project.manifest_path,
+    project=dbt_project,
+    name="dbt_movie_models",
+    # enable_asset_checks: each dbt test -> an asset check on its model
+    dagster_dbt_translator=MoviesDbtTranslator(
+        settings=DagsterDbtTranslatorSettings(enable_asset_checks=True),
+    ),
 )
-def run_dbt_tests(context: AssetExecutionContext) -> MaterializeResult:
-    """Run dbt test with --store-failures for post-run investigation."""
-    context.log.info("Running dbt tests...")
-
-    result = subprocess.run(
-        [
-            "dbt", "test",
-            "--profiles-dir", str(DBT_PROJECT_DIR),
-            "--store-failures",
-        ],
-        capture_output=True,
-        text=True,
-        cwd=str(DBT_PROJECT_DIR),
-        env=os.environ,
+def dbt_movie_models(context: AssetExecutionContext, dbt: DbtCliResource):
+    """Build all dbt models, snapshots and tests in dependency order."""
+    invocation = dbt.cli(
+        ["build", "--store-failures", "--threads", _DBT_THREADS],
+        context=context,
+        raise_on_error=False,   # summarise run_results.json first, then fail
     )
-
-    passed  = result.stdout.count("PASS")
-    failed  = result.stdout.count("FAIL")
-    warned  = result.stdout.count("WARN")
-    errored = result.stdout.count("ERROR")
-
-    context.log.info(result.stdout)
-
-    if result.returncode != 0:
-        context.log.warning(
-            f"Tests finished with failures: "
-            f"{passed} passed | {failed} failed | {warned} warned | {errored} errored"
-        )
-        # TEACHING: raise here to fail the pipeline on test failure (production pattern)
-        # Comment out the raise for teaching demos where you want to see all results
-        # raise RuntimeError("dbt tests failed -- check Dagster UI for details")
-
-    return MaterializeResult(
-        metadata={
-            "tests_passed":  passed,
-            "tests_failed":  failed,
-            "tests_warned":  warned,
-        }
+    yield from invocation.stream()
+
+    _log_run_results(context, invocation.target_path / "run_results.json")
+
+    if not invocation.is_successful():
+        raise RuntimeError("dbt build failed -- see the node summary above")
+
+
+# TEACHING NOTE -- run_results.json vs. scraping stdout:
+#   dbt writes target/run_results.json at the end of every invocation: one
+#   entry per model/snapshot/test with its "status" and "execution_time".
+#   Counting "PASS"/"FAIL" substrings in stdout is slow on big logs AND wrong
+#   as soon as a model name or log message contains one of those words.
+#   Reading the artifact dbt produces for exactly this purpose is faster
+#   and correct.
+def _log_run_results(context: AssetExecutionContext, run_results_path: Path) -> None:
+    """Log node counts by status and the slowest nodes from run_results.json."""
+    if not run_results_path.exists():
+        context.log.warning(f"{run_results_path} not found -- dbt did not get far enough to write it")
+        return
+
+    with open(run_results_path, encoding="utf-8") as f:
+        results = json.load(f)["results"]
+
+    statuses = Counter(r["status"] for r in results)
+    context.log.info(
+        "dbt build summary: "
+        + " | ".join(f"{count} {status}" for status, count in sorted(statuses.items()))
     )
 
+    slowest = sorted(results, key=lambda r: r["execution_time"], reverse=True)[:5]
+    for r in slowest:
+        context.log.info(f"  slowest: {r['execution_time']:7.2f}s  {r['unique_id']}")
+
 
 # =============================================================================
 # JOBS -- Named selections of assets that run together
@@ -395,45 +436,110 @@ def run_dbt_tests(context: AssetExecutionContext) -> MaterializeResult:
 #   AssetSelection.groups("gold") -> only assets in the "gold" group
 #   AssetSelection.keys("fact_movies") -> one specific asset
 #
-#   Combining with | (union) and & (intersection) lets you build
+#   Combining with | (union), & (intersection) and - (difference) lets you build
 #   precise selections without hardcoding individual asset names.
+#
+#   EXECUTOR -- two layers of parallelism that stack:
+#     Dagster: the multiprocess executor runs independent ops of a run side
+#              by side, at most max_concurrent at a time
+#              (DAGSTER_MAX_CONCURRENT, default 4).
+#     dbt:     inside the single dbt_movie_models op, --threads runs
+#              independent models side by side (DBT_THREADS).
+#   All dbt models live in ONE op, so the kpi_* marts fan out via dbt threads;
+#   max_concurrent bounds how many ops (ingest, dbt, future assets) overlap.
+_executor = multiprocess_executor.configured(
+    {"max_concurrent": int(os.environ.get("DAGSTER_MAX_CONCURRENT", "4"))}
+)
 
 full_pipeline_job = define_asset_job(
     name="full_movies_pipeline",
-    # Run everything: ingest -> dbt models -> snapshots -> tests
+    # Run everything: ingest -> dbt build (models + snapshots + tests)
     selection=AssetSelection.all(),
+    # Partitioned like the ingest asset; the dbt assets are unpartitioned and
+    # simply rebuild on every run.
+    partitions_def=daily_partitions,
+    executor_def=_executor,
     description="Full pipeline: TMDb API ingest -> dbt bronze/silver/gold/marts -> SCD2 snapshots -> tests",
 )
 
 dbt_only_job = define_asset_job(
     name="dbt_refresh_only",
-    # Skip ingestion; just run dbt models + snapshots + tests
-    selection=(
-        AssetSelection.groups("bronze")
-        | AssetSelection.groups("silver")
-        | AssetSelection.groups("gold")
-        | AssetSelection.groups("marts")
-        | AssetSelection.groups("transformation")
-        | AssetSelection.groups("validation")
-    ),
+    # Skip ingestion; just run dbt build.  "Everything except ingestion" rather
+    # than a list of groups, so untagged dbt nodes (e.g. the budget_tiers seed
+    # in the "transformation" group) are never silently left out.
+    selection=AssetSelection.all() - AssetSelection.groups("ingestion"),
+    executor_def=_executor,
     description="Refresh dbt models only (no API ingest). Use when testing transformations.",
 )
 
+# TEACHING NOTE -- asset checks:
+#   Every dbt test becomes an ASSET CHECK attached to the model it tests, so
+#   the UI shows "fact_movies: 11/12 checks passed" on the fact_movies node
+#   instead of one red dot for the whole test suite.
+#   AssetSelection.all_asset_checks() selects the checks WITHOUT their
+#   assets: this job runs the dbt tests against the tables as they are now,
+#   without rebuilding anything.
+data_quality_job = define_asset_job(
+    name="data_quality_checks",
+    selection=AssetSelection.all_asset_checks(),
+    description="Run every dbt test (as Dagster asset checks) without rebuilding any model.",
+)
+
 
 # =============================================================================
-# SCHEDULE -- Automate the pipeline
+# SCHEDULES -- Automate the pipeline
 # =============================================================================
+# TEACHING NOTE -- why a schedule and not a "has TMDb changed?" sensor:
+#   Ingestion is partitioned by release DAY, and every new day is a new
+#   partition that has never been loaded, so it needs one run whatever
+#   TMDb's listing looks like.  A sensor comparing HTTP ETags would fire on
+#   the first poll of each day anyway (a new day's listing has no ETag to
+#   compare with), i.e. it would be a daily cron plus a HEAD request every
+#   30 minutes.  And because the listing is sorted by popularity, its ETag
+#   changes whenever scores move, so "changed" does not mean "new movies".
+#   The honest trigger is the clock: build_schedule_from_partitioned_job()
+#   derives the schedule from the job's partitions, so every morning at
+#   06:00 UTC it runs the partition for the day that just ended.
+daily_schedule = build_schedule_from_partitioned_job(
+    full_pipeline_job,
+    hour_of_day=6,
+    name="daily_movies_pipeline",
+    description="Run the full TMDb pipeline for yesterday's releases every morning at 6:00 AM UTC",
+)
+
+
 # TEACHING NOTE:
 #   Cron syntax: minute  hour  day  month  weekday
 #   "0 6 * * *"   -> 6:00 AM every day
 #   "0 */6 * * *" -> every 6 hours
 #   "30 5 * * 1"  -> every Monday at 5:30 AM
-daily_schedule = ScheduleDefinition(
+#
+#   The weekly schedule is a CATCH-UP run behind the daily one: TMDb keeps
+#   adding movies to a release day after it has ended, and a daily run can
+#   fail.  Once a week it re-ingests the 7 daily partitions BEFORE
+#   yesterday, so late additions land and no day is ever skipped.
+#   Yesterday is left out because the daily schedule fires at the same
+#   moment and already ingests it.
+#   A partitioned job needs to know WHICH partitions each run is for.  The
+#   two range tags request ONE run covering all 7 days -- the same shape as
+#   a single_run backfill -- instead of 7 runs with 7 dbt builds.
+@schedule(
     job=full_pipeline_job,
-    cron_schedule="0 6 * * *",
-    name="daily_movies_pipeline",
-    description="Run the full TMDb pipeline every morning at 6:00 AM UTC",
+    cron_schedule="0 6 * * 1",
+    name="weekly_movies_pipeline",
+    description="Catch-up: every Monday at 6:00 AM UTC, re-ingest the 7 days before yesterday and rebuild dbt",
 )
+def weekly_schedule(context: ScheduleEvaluationContext):
+    last_week = daily_partitions.get_partition_keys(
+        current_time=context.scheduled_execution_time,
+    )[-8:-1]   # yesterday is the daily schedule's partition
+    return RunRequest(
+        run_key=f"weekly:{last_week[0]}...{last_week[-1]}",
+        tags={
+            "dagster/asset_partition_range_start": last_week[0],
+            "dagster/asset_partition_range_end":   last_week[-1],
+        },
+    )
 
 
 # =============================================================================
@@ -446,16 +552,16 @@ daily_schedule = ScheduleDefinition(
 defs = Definitions(
     assets=[
         ingest_tmdb_to_bronze,  # Python asset: API -> BRONZE.RAW_MOVIES
-        dbt_movie_models,       # dbt assets: bronze -> silver -> gold -> marts
-        run_dbt_snapshots,      # dbt snapshot: SCD2 history tables
-        run_dbt_tests,          # dbt test: data quality validation
+        dbt_movie_models,       # dbt assets: models + snapshots, tests as checks
     ],
     jobs=[
         full_pipeline_job,
         dbt_only_job,
+        data_quality_job,
     ],
     schedules=[
         daily_schedule,
+        weekly_schedule,
     ],
     resources={
         "dbt": dbt_resource,    # injected into dbt_movie_models at runtime
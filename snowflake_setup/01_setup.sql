@@ -104,6 +104,11 @@ CREATE TABLE IF NOT EXISTS LECTURE_DE.BRONZE.RAW_MOVIES (
     -- Batch tracking — group records from the same pipeline run
     BATCH_ID        VARCHAR(36)              COMMENT 'UUID identifying the pipeline run that loaded this row'
 );
+-- No CLUSTER BY: a clustering key turns on Automatic Clustering, which bills
+-- credits on every load, and pruning only pays off once a table spans many
+-- micro-partitions (multi-TB scale).  This table fits in one or two.  If it
+-- ever grows that large, opt in with:
+--   ALTER TABLE LECTURE_DE.BRONZE.RAW_MOVIES CLUSTER BY (MOVIE_ID);
 
 CREATE TABLE IF NOT EXISTS LECTURE_DE.BRONZE.RAW_GENRES (
     RAW_DATA        VARIANT         NOT NULL COMMENT 'Genre list JSON from TMDb /genre/movie/list',
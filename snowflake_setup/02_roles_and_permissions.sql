@@ -103,6 +103,14 @@ CREATE USER IF NOT EXISTS SVC_PIPELINE
 
 GRANT ROLE DE_ROLE TO USER SVC_PIPELINE;
 
+-- Key-pair authentication (used by the pipeline and dbt — see profiles.yml)
+-- TEACHING NOTE: generate the key pair locally, keep the private key secret:
+--   openssl genrsa 2048 | openssl pkcs8 -topk8 -inform PEM -out rsa_key.p8 -nocrypt
+--   openssl rsa -in rsa_key.p8 -pubout -out rsa_key.pub
+-- Paste the body of rsa_key.pub (without the BEGIN/END lines) below, then set
+-- SNOWFLAKE_PRIVATE_KEY_PATH=/path/to/rsa_key.p8 in .env.
+-- ALTER USER SVC_PIPELINE SET RSA_PUBLIC_KEY = 'MIIBIjANBgkqh...';
+
 -- Student / teaching user
 CREATE USER IF NOT EXISTS STUDENT_USER
     PASSWORD        = 'ReplaceMe_Student123!'
@@ -17,10 +17,14 @@ TEACHING NOTE:
 import os
 import logging
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
+from functools import lru_cache
 
-# Load .env file if it exists (does nothing if running in CI/CD with real env vars)
-load_dotenv()
+# Load .env file if it exists (does nothing if running in CI/CD with real env vars).
+# With DAGSTER_ENV=prod the platform injects every variable, so — exactly as in
+# orchestration/movies_pipeline.py — python-dotenv is not even imported.
+if os.getenv("DAGSTER_ENV") != "prod":
+    from dotenv import load_dotenv
+    load_dotenv()
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +35,8 @@ class TMDbConfig:
     api_key: str
     base_url: str
     pages_to_fetch: int
+    cache_dir: str
+    append_to_response: str
 
 
 @dataclass(frozen=True)
@@ -39,6 +45,8 @@ class SnowflakeConfig:
     account: str
     user: str
     password: str
+    private_key_path: str
+    private_key_passphrase: str
     role: str
     warehouse: str
     database: str
@@ -49,7 +57,9 @@ class SnowflakeConfig:
 class PipelineConfig:
     """General pipeline behaviour configuration."""
     batch_size: int
+    load_flush_rows: int
     log_level: str
+    skip_recent_hours: int
     tmdb: TMDbConfig = field(default=None)
     snowflake: SnowflakeConfig = field(default=None)
 
@@ -74,6 +84,7 @@ def _optional(key: str, default: str) -> str:
     return os.getenv(key, default)
 
 
+@lru_cache(maxsize=1)
 def load_config() -> PipelineConfig:
     """
     Load and validate all configuration from environment variables.
@@ -81,6 +92,14 @@ def load_config() -> PipelineConfig:
     Returns a fully-populated PipelineConfig. Raises EnvironmentError
     if any required variable is missing.
 
+    TEACHING NOTE:
+        The result is cached: environment variables do not change while the
+        process runs and PipelineConfig is frozen (immutable), so every
+        caller can safely share ONE instance.  Only the first call reads the
+        environment.  A failed call (EnvironmentError) is not cached.
+        Tests that modify os.environ must call load_config.cache_clear()
+        afterwards so the next call sees the new values.
+
     Usage:
         from src.config import load_config
         cfg = load_config()
@@ -92,12 +111,22 @@ def load_config() -> PipelineConfig:
         api_key=_require("TMDB_API_KEY"),
         base_url=_optional("TMDB_BASE_URL", "https://api.themoviedb.org/3"),
         pages_to_fetch=int(_optional("TMDB_PAGES_TO_FETCH", "20")),
+        cache_dir=os.path.expanduser(_optional("TMDB_CACHE_DIR", "~/.cache/tmdb")),
+        append_to_response=_optional("TMDB_APPEND_TO_RESPONSE", "keywords"),
     )
 
+    # Key-pair auth (preferred) needs no password; without a key, the password is required
+    private_key_path = _optional("SNOWFLAKE_PRIVATE_KEY_PATH", "")
+
     snowflake_config = SnowflakeConfig(
         account=_require("SNOWFLAKE_ACCOUNT"),
         user=_require("SNOWFLAKE_USER"),
-        password=_require("SNOWFLAKE_PASSWORD"),
+        password=(
+            _optional("SNOWFLAKE_PASSWORD", "") if private_key_path
+            else _require("SNOWFLAKE_PASSWORD")
+        ),
+        private_key_path=private_key_path,
+        private_key_passphrase=_optional("SNOWFLAKE_PRIVATE_KEY_PASSPHRASE", ""),
         role=_optional("SNOWFLAKE_ROLE", "DE_ROLE"),
         warehouse=_optional("SNOWFLAKE_WAREHOUSE", "LECTURE_INGEST_WH"),
         database=_optional("SNOWFLAKE_DATABASE", "LECTURE_DE"),
@@ -106,7 +135,9 @@ def load_config() -> PipelineConfig:
 
     pipeline_config = PipelineConfig(
         batch_size=int(_optional("BATCH_SIZE", "100")),
+        load_flush_rows=int(_optional("LOAD_FLUSH_ROWS", "2000")),
         log_level=_optional("LOG_LEVEL", "INFO"),
+        skip_recent_hours=int(_optional("SKIP_RECENT_HOURS", "24")),
         tmdb=tmdb_config,
         snowflake=snowflake_config,
     )
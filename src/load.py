@@ -7,7 +7,7 @@ TEACHING NOTE:
 
     Key patterns demonstrated:
       1. Context manager pattern — guarantees connection cleanup even on errors
-      2. Batch inserts — send N rows per round trip (not 1 at a time)
+      2. Bulk loading — stage files with PUT, load them with one COPY INTO
       3. Idempotent loading — MERGE/INSERT OR REPLACE prevents duplicate rows
       4. Separation of DDL and DML — table creation vs. data insertion are separate
       5. Transaction awareness — Snowflake auto-commits; explicit control shown
@@ -15,18 +15,39 @@ TEACHING NOTE:
 
 import json
 import logging
+import queue
+import tempfile
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Iterator, Any
 
 import snowflake.connector
+from cryptography.hazmat.primitives import serialization
 from snowflake.connector import DictCursor
+from snowflake.connector.cursor import SnowflakeCursor
 
 from src.config import SnowflakeConfig
 
+# orjson (Rust) serializes 3-10x faster than the stdlib json module.
+# It is optional: without it we fall back to json.dumps.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _to_json(obj: Any) -> str:
+    """Serialize obj to a JSON string, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
 class SnowflakeConnectionError(Exception):
     """Raised when Snowflake connection or authentication fails."""
     pass
@@ -67,7 +88,7 @@ class SnowflakeLoader:
             self.conn = snowflake.connector.connect(
                 account=self.config.account,
                 user=self.config.user,
-                password=self.config.password,
+                **self._auth_params(),
                 role=self.config.role,
                 warehouse=self.config.warehouse,
                 database=self.config.database,
@@ -82,6 +103,40 @@ class SnowflakeLoader:
         except snowflake.connector.errors.DatabaseError as e:
             raise SnowflakeConnectionError(f"Failed to connect to Snowflake: {e}") from e
 
+    def _auth_params(self) -> dict[str, Any]:
+        """
+        Return the authentication arguments for snowflake.connector.connect().
+
+        TEACHING NOTE — Key-pair (JWT) authentication:
+            With SNOWFLAKE_PRIVATE_KEY_PATH set, the connector signs a short-lived
+            JWT with our private key instead of sending a password.  Snowflake
+            verifies it against the public key registered on the user
+            (ALTER USER ... SET RSA_PUBLIC_KEY), so no password is ever stored
+            or transmitted, and there is no password check on the login path.
+            This is the recommended method for service accounts.
+            Without a key path we fall back to password authentication.
+        """
+        if not self.config.private_key_path:
+            return {"password": self.config.password}
+
+        passphrase = self.config.private_key_passphrase.encode() or None
+        try:
+            with open(self.config.private_key_path, "rb") as f:
+                private_key = serialization.load_pem_private_key(f.read(), password=passphrase)
+        except (OSError, ValueError) as e:
+            raise SnowflakeConnectionError(
+                f"Cannot read private key {self.config.private_key_path}: {e}"
+            ) from e
+
+        # The connector expects the key as unencrypted PKCS#8 DER bytes
+        return {
+            "private_key": private_key.private_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+        }
+
     def disconnect(self) -> None:
         """Close the Snowflake connection and release resources."""
         if self.conn and not self.conn.is_closed():
@@ -97,12 +152,27 @@ class SnowflakeLoader:
         # Return False to propagate exceptions (don't swallow errors)
         return False
 
+    @contextmanager
+    def _cursor(self) -> Iterator[SnowflakeCursor]:
+        """
+        Yield a cursor that is closed when the block exits.
+
+        TEACHING NOTE:
+            Statements that belong together (e.g. the steps of one load) should
+            share a cursor: open it once, run them all, close it once —
+            instead of allocating and tearing down a cursor per statement.
+        """
+        cur = self.conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
     def _execute(self, sql: str, params: list | None = None) -> None:
         """
-        Execute a single SQL statement.
-        Creates a fresh cursor per statement (Snowflake best practice).
+        Execute a single, standalone SQL statement on its own cursor.
         """
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             cur.execute(sql, params or [])
 
     def _executemany(self, sql: str, rows: list[tuple]) -> int:
@@ -123,7 +193,7 @@ class SnowflakeLoader:
         Returns:
             Number of rows inserted
         """
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             cur.executemany(sql, rows)
             return cur.rowcount
 
@@ -134,6 +204,20 @@ class SnowflakeLoader:
         """
         logger.info("Ensuring Bronze tables exist")
 
+        # TEACHING NOTE — why there is no CLUSTER BY here:
+        #   A clustering key makes Snowflake run Automatic Clustering, a
+        #   background service billed in credits every time new rows land.
+        #   Pruning only helps when a table spans many micro-partitions
+        #   (each holds ~16 MB compressed).  A few thousand movies fit in
+        #   one or two, so the MERGE reads them all anyway: we would pay
+        #   for clustering and get nothing back.  Snowflake's guidance is
+        #   to consider a key for multi-terabyte tables.  If RAW_MOVIES
+        #   ever grows that large and the MERGE's query profile shows it
+        #   scanning most partitions, opt in by hand:
+        #       ALTER TABLE BRONZE.RAW_MOVIES CLUSTER BY (MOVIE_ID);
+        #   An existing table created with the key keeps it (IF NOT EXISTS
+        #   leaves it untouched); remove it with
+        #       ALTER TABLE BRONZE.RAW_MOVIES DROP CLUSTERING KEY;
         self._execute("""
             CREATE TABLE IF NOT EXISTS BRONZE.RAW_MOVIES (
                 MOVIE_ID     NUMBER        NOT NULL,
@@ -165,9 +249,23 @@ class SnowflakeLoader:
             This property is called "idempotency" and is critical in pipelines
             because failures and retries are normal, expected events.
 
+        TEACHING NOTE — Staged bulk load (PUT + COPY INTO):
+            Binding rows into INSERT/MERGE statements sends every row through
+            the SQL layer one statement at a time.  Snowflake's bulk path is
+            file based, and it is what this method uses:
+              1. Write the movies to local newline-delimited JSON files
+              2. PUT the files to the stage of a temporary staging table
+                 (the connector gzips and uploads them in parallel)
+              3. COPY INTO the staging table — one statement, all files
+              4. MERGE staging → RAW_MOVIES — one statement, all rows
+            Four statements per call, however many movies it is given — so
+            the per-call overhead is fixed, and callers should pass large
+            lists (thousands of rows), not a few dozen at a time.
+            MovieBatchWriter calls this once every LOAD_FLUSH_ROWS movies.
+
         Args:
             movies:     List of raw movie dicts from TMDb API
-            batch_size: Number of rows per Snowflake round-trip
+            batch_size: Number of rows per staged file (COPY loads files in parallel)
 
         Returns:
             Total number of rows inserted/updated
@@ -177,64 +275,107 @@ class SnowflakeLoader:
             return 0
 
         ingested_at = datetime.now(timezone.utc).isoformat()
-        source_url = "https://api.themoviedb.org/3/movie/{id}"
-        total_loaded = 0
-
-        # TEACHING NOTE: PARSE_JSON() converts a JSON string into a VARIANT column.
-        # We pass the JSON as a string and let Snowflake parse it — this is more
-        # reliable than using Python to build Snowflake VARIANT directly.
-        merge_sql = """
-            MERGE INTO BRONZE.RAW_MOVIES AS target
-            USING (
-                SELECT
-                    %s::NUMBER        AS movie_id,
-                    PARSE_JSON(%s)    AS raw_data,
-                    %s::VARCHAR       AS source_url,
-                    %s::TIMESTAMP_NTZ AS ingested_at,
-                    %s::VARCHAR       AS batch_id
-            ) AS source
-            ON target.MOVIE_ID = source.movie_id
-            WHEN MATCHED THEN
-                UPDATE SET
-                    target.RAW_DATA     = source.raw_data,
-                    target.SOURCE_URL   = source.source_url,
-                    target.INGESTED_AT  = source.ingested_at,
-                    target.BATCH_ID     = source.batch_id
-            WHEN NOT MATCHED THEN
-                INSERT (MOVIE_ID, RAW_DATA, SOURCE_URL, INGESTED_AT, BATCH_ID)
-                VALUES (source.movie_id, source.raw_data, source.source_url,
-                        source.ingested_at, source.batch_id)
-        """
 
-        # Process in batches to avoid memory issues with very large datasets
-        for batch_start in range(0, len(movies), batch_size):
-            batch = movies[batch_start: batch_start + batch_size]
-
-            rows = [
-                (
-                    movie.get("id"),
-                    json.dumps(movie),   # Serialize dict → JSON string
-                    source_url,
-                    ingested_at,
-                    self.batch_id,
+        # One cursor for the whole load: all four statements run on it in turn
+        with self._cursor() as cur:
+            # TEMPORARY: private to this session, dropped automatically at disconnect.
+            # CREATE OR REPLACE also empties its table stage (@%RAW_MOVIES_STG).
+            # One VARIANT column: COPY from a table stage cannot transform data
+            # (no SELECT over the files), so MOVIE_ID is extracted in the MERGE.
+            cur.execute("""
+                CREATE OR REPLACE TEMPORARY TABLE BRONZE.RAW_MOVIES_STG (
+                    RAW_DATA  VARIANT
                 )
-                for movie in batch
-                if movie.get("id")  # Skip malformed records missing an ID
-            ]
-
-            if rows:
-                for row in rows:
-                    self._execute(merge_sql, list(row))
-                    total_loaded += 1
-
-            logger.info(
-                f"Loaded batch {batch_start // batch_size + 1}: "
-                f"{len(rows)} movies (total so far: {total_loaded})"
-            )
+            """)
+
+            with tempfile.TemporaryDirectory(prefix="raw_movies_") as tmp_dir:
+                n_rows, n_files = self._write_ndjson_files(movies, Path(tmp_dir), batch_size)
+                if n_rows == 0:
+                    logger.warning("No movies with an ID to load.")
+                    return 0
+
+                # PUT accepts a wildcard; forward slashes keep Windows paths valid
+                cur.execute(
+                    f"PUT 'file://{Path(tmp_dir).as_posix()}/*.json' @BRONZE.%RAW_MOVIES_STG "
+                    f"AUTO_COMPRESS = TRUE PARALLEL = 4"
+                )
+            logger.info(f"Staged {n_rows} movies in {n_files} file(s)")
+
+            # TEACHING NOTE: each JSON line becomes one row in the single VARIANT
+            # column.  PARSE_JSON is not needed — FILE_FORMAT = JSON already
+            # yields VARIANT.  A plain COPY (no transformation) is the form that
+            # table stages (@%TABLE) support.
+            cur.execute("""
+                COPY INTO BRONZE.RAW_MOVIES_STG
+                FROM @BRONZE.%RAW_MOVIES_STG
+                FILE_FORMAT = (TYPE = JSON)
+                PURGE = TRUE
+            """)
+
+            # QUALIFY keeps one row per MOVIE_ID — MERGE fails on duplicate source keys.
+            # SOURCE_URL is derived from MOVIE_ID in SQL: nothing extra is bound or staged.
+            merge_sql = """
+                MERGE INTO BRONZE.RAW_MOVIES AS target
+                USING (
+                    SELECT
+                        movie_id,
+                        raw_data,
+                        'https://api.themoviedb.org/3/movie/' || movie_id AS source_url,
+                        %s::TIMESTAMP_NTZ AS ingested_at,
+                        %s::VARCHAR       AS batch_id
+                    FROM (
+                        SELECT RAW_DATA:id::NUMBER AS movie_id, RAW_DATA AS raw_data
+                        FROM BRONZE.RAW_MOVIES_STG
+                    )
+                    QUALIFY ROW_NUMBER() OVER (PARTITION BY movie_id ORDER BY movie_id) = 1
+                ) AS source
+                ON target.MOVIE_ID = source.movie_id
+                WHEN MATCHED THEN
+                    UPDATE SET
+                        target.RAW_DATA     = source.raw_data,
+                        target.SOURCE_URL   = source.source_url,
+                        target.INGESTED_AT  = source.ingested_at,
+                        target.BATCH_ID     = source.batch_id
+                WHEN NOT MATCHED THEN
+                    INSERT (MOVIE_ID, RAW_DATA, SOURCE_URL, INGESTED_AT, BATCH_ID)
+                    VALUES (source.movie_id, source.raw_data, source.source_url,
+                            source.ingested_at, source.batch_id)
+            """
+            cur.execute(merge_sql, [ingested_at, self.batch_id])
+            # MERGE returns one row: (rows inserted, rows updated)
+            total_loaded = sum(cur.fetchone())
 
         logger.info(f"Movie load complete. Total rows loaded: {total_loaded}")
         return total_loaded
 
+    @staticmethod
+    def _write_ndjson_files(movies: list[dict], out_dir: Path, rows_per_file: int) -> tuple[int, int]:
+        """
+        Write movies as newline-delimited JSON, rows_per_file rows per file.
+
+        Returns:
+            (rows written, files written)
+        """
+        n_rows = 0
+        n_files = 0
+        f = None
+        try:
+            for movie in movies:
+                if not movie.get("id"):  # Skip malformed records missing an ID
+                    continue
+                if n_rows % rows_per_file == 0:
+                    if f:
+                        f.close()
+                    f = open(out_dir / f"movies_{n_files:05d}.json", "w", encoding="utf-8")
+                    n_files += 1
+                f.write(_to_json(movie))   # Serialize dict → JSON string
+                f.write("\n")
+                n_rows += 1
+        finally:
+            if f:
+                f.close()
+        return n_rows, n_files
+
     def load_genres(self, genres: list[dict]) -> int:
         """
         Load the genre reference list into BRONZE.RAW_GENRES.
@@ -253,18 +394,38 @@ class SnowflakeLoader:
         """
 
         # Store all genres as a single JSON array row
-        payload = json.dumps(genres)
+        payload = _to_json(genres)
         self._execute(insert_sql, [payload, ingested_at, self.batch_id])
 
         logger.info(f"Loaded {len(genres)} genres into BRONZE.RAW_GENRES")
         return 1
 
+    def get_recent_movie_ids(self, since_hours: int = 24) -> set[int]:
+        """
+        Return the IDs of movies loaded into BRONZE.RAW_MOVIES in the last since_hours.
+
+        TEACHING NOTE:
+            Fetching a movie's detail costs one API request.  If Bronze already
+            holds a copy from the last day, re-fetching it mostly re-downloads
+            the same JSON.  The extractor skips these IDs, so a repeat or
+            incremental run only pays for movies that are new or stale.
+            INGESTED_AT is stored in UTC (TIMESTAMP_NTZ), so we compare it
+            with SYSDATE(), which is also UTC without a time zone.
+        """
+        with self._cursor() as cur:
+            cur.execute(
+                "SELECT MOVIE_ID FROM BRONZE.RAW_MOVIES "
+                "WHERE INGESTED_AT > DATEADD(hour, -%s, SYSDATE())",
+                [since_hours],
+            )
+            return {row[0] for row in cur.fetchall()}
+
     def get_row_count(self, table: str) -> int:
         """
         Return current row count for a table.
         Used for post-load validation — verify data actually arrived.
         """
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             cur.execute(f"SELECT COUNT(*) FROM {table}")
             return cur.fetchone()[0]
 
@@ -279,8 +440,14 @@ class SnowflakeLoader:
         """
         logger.info("Running post-load data quality checks...")
 
-        movies_count = self.get_row_count("BRONZE.RAW_MOVIES")
-        genres_count = self.get_row_count("BRONZE.RAW_GENRES")
+        # Both counts in one statement — one round-trip instead of two
+        with self._cursor() as cur:
+            cur.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM BRONZE.RAW_MOVIES),
+                    (SELECT COUNT(*) FROM BRONZE.RAW_GENRES)
+            """)
+            movies_count, genres_count = cur.fetchone()
 
         logger.info(f"  BRONZE.RAW_MOVIES row count: {movies_count}")
         logger.info(f"  BRONZE.RAW_GENRES row count: {genres_count}")
@@ -289,3 +456,88 @@ class SnowflakeLoader:
             logger.error("QUALITY CHECK FAILED: BRONZE.RAW_MOVIES is empty after load!")
         else:
             logger.info(f"QUALITY CHECK PASSED: {movies_count} movies in Bronze")
+
+
+class MovieBatchWriter:
+    """
+    Loads movies into Snowflake on a background thread, flush_rows at a time,
+    while the caller keeps extracting.
+
+    TEACHING NOTE — Producer / consumer:
+        Extracting everything first and loading afterwards makes the run take
+        extract_time + load_time, and holds every movie in memory.  Here the
+        extractor (producer) put()s each movie on a bounded queue and a
+        loader thread (consumer) sends every flush_rows movies to Snowflake.
+        Both run at the same time, so the run takes roughly
+        max(extract_time, load_time), and memory holds one flush plus a
+        short queue.  The queue is bounded: if Snowflake is slower than
+        TMDb, put() blocks and extraction waits instead of buffering
+        without limit.
+
+        Choosing flush_rows: every flush is a full staged load (CREATE,
+        PUT, COPY, MERGE — see load_movies), so flushing every 100 rows
+        would pay that fixed cost dozens of times per run.  Flushes are
+        therefore large (LOAD_FLUSH_ROWS, default 2000); within a flush,
+        file_rows (BATCH_SIZE) only sets the size of each staged file.
+        A default run (~400 movies) is one flush at the end; overlap with
+        extraction pays off on backfills and large page counts.
+
+    Example:
+        with MovieBatchWriter(loader, flush_rows=2000, file_rows=100) as writer:
+            for movie in extractor.extract_movies_with_details():
+                writer.put(movie)
+        print(writer.rows_loaded)
+    """
+
+    _DONE = object()  # Sentinel telling the consumer no more movies are coming
+
+    def __init__(self, loader: SnowflakeLoader, flush_rows: int = 2000, file_rows: int = 100):
+        self.loader = loader
+        self.flush_rows = flush_rows
+        self.file_rows = file_rows
+        self.rows_loaded = 0
+        self._error: BaseException | None = None
+        self._queue: queue.Queue = queue.Queue(maxsize=2 * file_rows)
+        self._thread = threading.Thread(target=self._consume, name="movie-loader", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Flush whatever was extracted, even if extraction failed part-way —
+        # the MERGE is idempotent, so a re-run simply overwrites these rows.
+        self._queue.put(self._DONE)
+        self._thread.join()
+        if self._error is not None and exc_type is None:
+            raise self._error
+        return False
+
+    def put(self, movie: dict) -> None:
+        """Queue one movie for loading. Raises if the loader thread has failed."""
+        if self._error is not None:
+            raise self._error
+        self._queue.put(movie)
+
+    def _consume(self) -> None:
+        batch: list[dict] = []
+        while True:
+            item = self._queue.get()
+            if item is not self._DONE:
+                batch.append(item)
+            if batch and (len(batch) >= self.flush_rows or item is self._DONE):
+                self._load(batch)
+                batch = []
+            if item is self._DONE:
+                return
+
+    def _load(self, batch: list[dict]) -> None:
+        # After a failure keep draining the queue (so put() never blocks
+        # forever) but stop writing to Snowflake.
+        if self._error is not None:
+            return
+        try:
+            self.rows_loaded += self.loader.load_movies(batch, batch_size=self.file_rows)
+        except BaseException as e:
+            logger.error(f"Background movie load failed: {e}")
+            self._error = e
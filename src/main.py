@@ -11,12 +11,11 @@ TEACHING NOTE:
 
     Pipeline steps:
         1. Load configuration (fail fast if misconfigured)
-        2. Extract genres from TMDb API
-        3. Extract movie details from TMDb API (paginated)
-        4. Load genres to Snowflake Bronze
-        5. Load movies to Snowflake Bronze
-        6. Run post-load quality checks
-        7. Log summary stats
+        2. Extract genres from TMDb API and load them to Snowflake Bronze
+        3. Extract movie details from TMDb API (paginated) and stream them
+           to Snowflake Bronze in batches while extraction continues
+        4. Run post-load quality checks
+        5. Log summary stats
 
 Run with:
     python -m src.main
@@ -27,15 +26,18 @@ import argparse
 import logging
 import sys
 import time
+from contextlib import nullcontext
 from datetime import datetime, timezone
 
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+from rich.progress import (
+    Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, MofNCompleteColumn,
+)
 
-from src.config import load_config, setup_logging
+from src.config import PipelineConfig, load_config, setup_logging
 from src.extract import TMDbExtractor
-from src.load import SnowflakeLoader
+from src.load import MovieBatchWriter, SnowflakeLoader
 
 console = Console()
 logger = logging.getLogger(__name__)
@@ -51,6 +53,8 @@ Examples:
   python -m src.main                  # Full run (pages from .env)
   python -m src.main --pages 2        # Quick test: fetch 2 pages (~40 movies)
   python -m src.main --dry-run        # Extract only, do not write to Snowflake
+  python -m src.main --from-date 2024-03-01 --to-date 2024-03-07
+                                      # Movies released in that window only
         """
     )
     parser.add_argument(
@@ -65,36 +69,76 @@ Examples:
         default=False,
         help="Extract data but do NOT write to Snowflake. Useful for testing."
     )
-    return parser.parse_args()
-
-
-def run_pipeline(pages: int | None = None, dry_run: bool = False) -> dict:
+    parser.add_argument(
+        "--from-date",
+        default=None,
+        help="Only ingest movies released on/after this date (YYYY-MM-DD). Requires --to-date."
+    )
+    parser.add_argument(
+        "--to-date",
+        default=None,
+        help="Only ingest movies released on/before this date (YYYY-MM-DD). Requires --from-date."
+    )
+    args = parser.parse_args()
+    if bool(args.from_date) != bool(args.to_date):
+        parser.error("--from-date and --to-date must be given together")
+    return args
+
+
+def run_pipeline(
+    pages: int | None = None,
+    dry_run: bool = False,
+    config: PipelineConfig | None = None,
+    log: logging.Logger | None = None,
+    release_dates: tuple[str, str] | None = None,
+) -> dict:
     """
     Execute the full ingestion pipeline.
 
     Args:
         pages:   Override number of API pages to fetch
         dry_run: If True, skip the Snowflake load step
+        config:  Pre-loaded configuration (loaded from the environment if None)
+        log:     Logger for step-by-step progress (module logger if None).
+                 Dagster passes context.log here to stream into its run log.
+                 When a logger is injected, rich output (panels, spinner,
+                 progress bar) is switched off -- see the note below.
+        release_dates: Optional (start, end) release-date window, inclusive.
+                 When set, movies come from /discover/movie for that window
+                 instead of /movie/popular, with `pages` applied per day.
 
     Returns:
         Summary stats dict
     """
+    # TEACHING NOTE -- rich output outside a terminal:
+    #   The panels and progress bar are for a human at a terminal.  When a
+    #   caller injects its own logger (Dagster), stdout is a captured pipe,
+    #   not a terminal: on Windows that pipe uses the cp1252 code page, and
+    #   rich's braille spinner frames and arrows crash with
+    #   UnicodeEncodeError.  The injected logger already reports every step,
+    #   so we render nothing at all: Console(quiet=True) drops all output,
+    #   whatever the pipe's encoding.
+    out = console if log is None else Console(quiet=True)
+    log = log or logger
     pipeline_start = time.time()
 
     # ─── STEP 1: Configuration ────────────────────────────────────────────────
-    console.print(Panel.fit(
+    out.print(Panel.fit(
         "[bold cyan]TMDb Movie Data Engineering Pipeline[/bold cyan]\n"
         "[dim]Bronze Layer Ingestion[/dim]",
         border_style="cyan"
     ))
 
-    logger.info("=" * 60)
-    logger.info("PIPELINE STARTED")
-    logger.info("=" * 60)
+    log.info("=" * 60)
+    log.info("PIPELINE STARTED")
+    log.info("=" * 60)
 
-    cfg = load_config()
+    cfg = config or load_config()
     pages_to_fetch = pages or cfg.tmdb.pages_to_fetch
-    logger.info(f"Configuration: pages={pages_to_fetch}, dry_run={dry_run}")
+    log.info(
+        f"Configuration: pages={pages_to_fetch}, dry_run={dry_run}, "
+        f"release_dates={release_dates}"
+    )
 
     stats = {
         "start_time": datetime.now(timezone.utc).isoformat(),
@@ -107,78 +151,97 @@ def run_pipeline(pages: int | None = None, dry_run: bool = False) -> dict:
         "duration_seconds": 0,
     }
 
-    # ─── STEP 2: Extraction ───────────────────────────────────────────────────
-    movies: list[dict] = []
-    genres: list[dict] = []
+    # ─── STEP 2: Extract + load ──────────────────────────────────────────────
+    # TEACHING NOTE: the Snowflake connection is opened up front so movies can
+    # be loaded while later ones are still being extracted (see
+    # MovieBatchWriter).  In dry-run mode nullcontext() stands in for the
+    # loader and yields None, so nothing is written.
+    n_movies = 0
 
-    with TMDbExtractor(cfg.tmdb) as extractor:
+    with TMDbExtractor(cfg.tmdb) as extractor, \
+            (nullcontext() if dry_run else SnowflakeLoader(cfg.snowflake)) as loader:
 
         # Extract genre reference list
-        logger.info("Step 1/3: Extracting genre list")
+        log.info("Step 1/3: Extracting genre list")
         genres = extractor.extract_genre_list()
         stats["genres_extracted"] = len(genres)
 
-        # Extract movies with progress bar
-        logger.info(f"Step 2/3: Extracting movies ({pages_to_fetch} pages)")
-        console.print(f"\n[yellow]Fetching {pages_to_fetch} pages of popular movies...[/yellow]")
-
-        with Progress(
+        if loader:
+            # Ensure tables exist before loading
+            loader.ensure_tables_exist()
+            # Load genres first (smaller, reference data)
+            stats["genres_loaded"] = loader.load_genres(genres)
+            # Movies already fresh in Bronze don't need their details re-fetched
+            recent_ids = (
+                loader.get_recent_movie_ids(since_hours=cfg.skip_recent_hours)
+                if cfg.skip_recent_hours > 0 else set()
+            )
+        else:
+            recent_ids = set()
+            log.info("DRY RUN mode — skipping Snowflake load")
+
+        # Extract movies with progress bar; each one is handed to the writer
+        log.info(f"Step 2/3: Extracting and loading movies ({pages_to_fetch} pages)")
+        source = (
+            f"movies released {release_dates[0]} → {release_dates[1]}, per day"
+            if release_dates else "popular movies"
+        )
+        out.print(f"\n[yellow]Fetching up to {pages_to_fetch} pages of {source}...[/yellow]")
+
+        writer = (
+            MovieBatchWriter(loader, flush_rows=cfg.load_flush_rows, file_rows=cfg.batch_size)
+            if loader else nullcontext()
+        )
+        with writer, Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             TaskProgressColumn(),
-            console=console,
+            MofNCompleteColumn(),
+            console=out,
         ) as progress:
-            task = progress.add_task("Extracting movies...", total=pages_to_fetch * 20)
-
-            for movie in extractor.extract_movies_with_details(pages=pages_to_fetch):
-                movies.append(movie)
+            # Total unknown until the listing is fetched; the extractor reports it
+            # via on_total (a listing can run out of pages before pages_to_fetch)
+            task = progress.add_task("Extracting movies...", total=None)
+
+            for movie in extractor.extract_movies_with_details(
+                pages=pages_to_fetch,
+                release_dates=release_dates,
+                skip_ids=recent_ids,
+                on_total=lambda total: progress.update(task, total=total),
+            ):
+                if loader:
+                    writer.put(movie)
+                n_movies += 1
                 progress.advance(task)
 
-                if len(movies) % 100 == 0:
-                    logger.info(f"Extracted {len(movies)} movies so far...")
-
-        stats["movies_extracted"] = len(movies)
+        stats["movies_extracted"] = n_movies
         stats["pages_fetched"] = pages_to_fetch
-        logger.info(f"Extraction complete: {len(movies)} movies, {len(genres)} genres")
-
-    if dry_run:
-        logger.info("DRY RUN mode — skipping Snowflake load")
-        console.print("\n[yellow]DRY RUN: Extraction complete. Snowflake load skipped.[/yellow]")
-        stats["duration_seconds"] = round(time.time() - pipeline_start, 2)
-        return stats
-
-    # ─── STEP 3: Loading ──────────────────────────────────────────────────────
-    logger.info("Step 3/3: Loading data to Snowflake Bronze")
-    console.print("\n[yellow]Loading data to Snowflake Bronze layer...[/yellow]")
-
-    with SnowflakeLoader(cfg.snowflake) as loader:
-        # Ensure tables exist before loading
-        loader.ensure_tables_exist()
+        log.info(f"Extraction complete: {n_movies} movies, {len(genres)} genres")
 
-        # Load genres first (smaller, reference data)
-        genres_loaded = loader.load_genres(genres)
-        stats["genres_loaded"] = genres_loaded
+        if dry_run:
+            out.print("\n[yellow]DRY RUN: Extraction complete. Snowflake load skipped.[/yellow]")
+            stats["duration_seconds"] = round(time.time() - pipeline_start, 2)
+            return stats
 
-        # Load movies in batches
-        movies_loaded = loader.load_movies(movies, batch_size=cfg.batch_size)
-        stats["movies_loaded"] = movies_loaded
+        stats["movies_loaded"] = writer.rows_loaded
 
-        # Post-load validation
+        # ─── STEP 3: Validation ───────────────────────────────────────────────
+        log.info("Step 3/3: Validating Snowflake Bronze load")
         loader.run_post_load_checks()
 
     # ─── STEP 4: Summary ──────────────────────────────────────────────────────
     stats["duration_seconds"] = round(time.time() - pipeline_start, 2)
 
-    logger.info("=" * 60)
-    logger.info("PIPELINE COMPLETED SUCCESSFULLY")
-    logger.info(f"  Movies extracted : {stats['movies_extracted']}")
-    logger.info(f"  Movies loaded    : {stats['movies_loaded']}")
-    logger.info(f"  Genres loaded    : {stats['genres_extracted']}")
-    logger.info(f"  Duration         : {stats['duration_seconds']}s")
-    logger.info("=" * 60)
+    log.info("=" * 60)
+    log.info("PIPELINE COMPLETED SUCCESSFULLY")
+    log.info(f"  Movies extracted : {stats['movies_extracted']}")
+    log.info(f"  Movies loaded    : {stats['movies_loaded']}")
+    log.info(f"  Genres loaded    : {stats['genres_extracted']}")
+    log.info(f"  Duration         : {stats['duration_seconds']}s")
+    log.info("=" * 60)
 
-    console.print(Panel.fit(
+    out.print(Panel.fit(
         f"[bold green]Pipeline Complete![/bold green]\n\n"
         f"  Movies extracted : [cyan]{stats['movies_extracted']}[/cyan]\n"
         f"  Movies loaded    : [cyan]{stats['movies_loaded']}[/cyan]\n"
@@ -208,7 +271,13 @@ def main() -> int:
         return 1
 
     try:
-        run_pipeline(pages=args.pages, dry_run=args.dry_run)
+        release_dates = (args.from_date, args.to_date) if args.from_date else None
+        run_pipeline(
+            pages=args.pages,
+            dry_run=args.dry_run,
+            config=cfg,
+            release_dates=release_dates,
+        )
         return 0
     except KeyboardInterrupt:
         logger.info("Pipeline interrupted by user (Ctrl+C)")